@@ -1,7 +1,15 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import TYPE_CHECKING, List
+
 import uombooker
 from uombooker import Location, Session
 from uombooker.utils.exceptions import AlreadyBookedError, SessionExpiredError, UnknownBookingError
 
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
+
 
 # note: make sure to set this
 fp_config: str = 'user_config.yml'
@@ -12,28 +20,69 @@ sessions_to_book = [
     (Location.AGLC, Session.FriAM)
 ]
 
+# webdrivers are not thread-safe - each worker thread holds its own. With one
+# worker per session each thread normally makes a single booking, so a browser
+# is only reused if a thread happens to pick up a second session.
+_local = threading.local()
+_drivers: List['WebDriver'] = []
+_drivers_lock = threading.Lock()
+
 
 def err_msg(msg: str, loc: Location, sess: Session) -> None:
     print(f'{msg}: loc={loc.name}\tsess={sess.name}')
 
 
+def _get_driver() -> 'WebDriver':
+
+    """Get the browser for the current thread, starting one if required."""
+
+    driver = getattr(_local, 'driver', None)
+
+    if driver is None:
+        driver = uombooker.Booker.create_browser()
+        _local.driver = driver
+
+        with _drivers_lock:
+            _drivers.append(driver)
+
+    return driver
+
+
+def _do_booking(loc: Location, sess: Session, config_path: str) -> None:
+
+    """Book a single session using the current thread's browser."""
+
+    booker = uombooker.Booker(location=loc, session=sess, config_path=config_path)
+    booker.set_browser(_get_driver())
+    booker.book()
+
+
 if __name__ == '__main__':
 
-    for loc, sess in sessions_to_book:
-
-        try:
-            booker = uombooker.Booker(location=loc, session=sess, config_path=fp_config)
-        except SessionExpiredError:
-            err_msg('Session has expired', loc, sess)
-            continue
-
-        try:
-            booker.book()
-        except AlreadyBookedError:
-            err_msg('Session already booked', loc, sess)
-            continue
-        except UnknownBookingError:
-            err_msg('Unknown Error', loc, sess)
-            continue
+    try:
+        with ThreadPoolExecutor(max_workers=max(len(sessions_to_book), 1)) as executor:
+            futures = [
+                (loc, sess, executor.submit(_do_booking, loc, sess, fp_config))
+                for loc, sess in sessions_to_book
+            ]
+
+            for loc, sess, future in futures:
+
+                try:
+                    future.result()
+                except SessionExpiredError:
+                    err_msg('Session has expired', loc, sess)
+                    continue
+                except AlreadyBookedError:
+                    err_msg('Session already booked', loc, sess)
+                    continue
+                except UnknownBookingError:
+                    err_msg('Unknown Error', loc, sess)
+                    continue
+    finally:
+        # every callback runs even if an earlier quit raises
+        with ExitStack() as stack:
+            for driver in _drivers:
+                stack.callback(driver.quit)
 
     print('Sessions Booked...')
@@ -1,13 +1,15 @@
+import base64
 import datetime
+import functools
 import os
-from typing import Optional, Union
+import threading
+import weakref
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
 
-import yaml
-from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.webdriver import WebDriver
-from webdriver_manager.chrome import ChromeDriverManager
+# yaml / selenium are imported where used - expired sessions never need them
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.webdriver import WebDriver
 
 from .utils import Location, Session
 from .utils.exceptions import (
@@ -15,13 +17,104 @@ from .utils.exceptions import (
 )
 
 
+# weekday / morning flag of each Session, indexed by its value
+_SESSION_DAY: Tuple[Optional[int], ...] = (None, 0, 0, 1, 1, 2, 2, 3, 3, 4, 4)
+_SESSION_IS_AM: Tuple[Optional[bool], ...] = (None,) + (True, False) * 5
+
+# parsed user configs keyed on path, invalidated by (st_mtime_ns, st_size)
+_YAML_CACHE: Dict[str, Tuple[int, int, dict]] = {}
+
+# held across check / parse / store so concurrent bookings parse only once
+_YAML_CACHE_LOCK = threading.Lock()
+
+
+# shared browsers which have completed a login in an earlier booking
+_LOGGED_IN_BROWSERS: 'weakref.WeakSet[WebDriver]' = weakref.WeakSet()
+
+# lru_cache does not lock while resolving - concurrent first calls would
+# otherwise each run ChromeDriverManager().install() into the same cache
+_DRIVER_PATH_LOCK = threading.Lock()
+
+
+def _driver_path() -> str:
+
+    """Resolve the chromedriver path once per process."""
+
+    with _DRIVER_PATH_LOCK:
+        return _resolve_driver_path()
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_driver_path() -> str:
+
+    """Install chromedriver via webdriver_manager, callers must hold the lock."""
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    return ChromeDriverManager().install()
+
+
 class Booker:
 
+    _BOOKING_URL: str = 'https://www.library.manchester.ac.uk/locations-and-opening-hours/study-spaces/booking/'
+
+    _SESSION_XPATH_TMPL: str = '//*[@id="content"]/div/section/article/div[{loc}]/table/tbody/tr[{sess}]/td[4]/a'
+    _CONFIRM_SELECTOR: str = '#content > div > section > article > a'
+    _REGISTER_XPATH: str = '//*[@id="register"]/div[5]/input'
+
+    # seconds to wait for a page opened by a scripted click
+    _NAVIGATION_TIMEOUT: float = 10
+
+    # status headings shown after login / registration
+    _MSG_ALREADY_BOOKED: str = 'You are already signed up for this event.'
+    _MSG_BOOKED: str = 'Thank you, you have registered for this study space period.'
+    _MSG_CLOSED: str = 'Bookings for this study space period are now closed.'
+
+    # click an element without a preceding find_element round-trip - returns
+    # False if the element is not on the page
+    _CLICK_XPATH_JS: str = (
+        "const el = document.evaluate(arguments[0], document, null,"
+        " XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;"
+        "if (!el) { return false; }"
+        "el.click();"
+        "return true;"
+    )
+
+    # number of rows in each location's session table
+    _EVENT_ROWS_JS: str = (
+        "return Array.from(document.getElementsByClassName('event'),"
+        " e => e.getElementsByTagName('tr').length);"
+    )
+
+    # reads the login error and status heading in a single round-trip, using
+    # rendered text with collapsed whitespace to match WebElement.text
+    _PROBE_STATUS_JS: str = (
+        "const text = el => el ? el.innerText.replace(/\\s+/g, ' ').trim() : null;"
+        "return ["
+        "  text(document.querySelector('div#msg.errors')),"
+        "  text(document.querySelector('#content > div > section > article > h3'))"
+        "];"
+    )
+
+    # fills the login form in a single round-trip - returns False if no login
+    # form is shown
+    _FILL_LOGIN_JS: str = (
+        "const user = document.getElementById('username');"
+        "const pass = document.getElementById('password');"
+        "if (!user || !pass) { return false; }"
+        "user.value = arguments[0];"
+        "pass.value = arguments[1];"
+        "for (const el of [user, pass]) {"
+        "  el.dispatchEvent(new Event('input', {bubbles: true}));"
+        "}"
+        "return true;"
+    )
+
     def __init__(self,
                  location: Location,
                  session: Session,
                  config_path: str = 'config.yml',
-                 options: Optional[Options] = None) -> None:
+                 options: Optional['Options'] = None) -> None:
 
         """Study Space Booking Class.
 
@@ -40,15 +133,13 @@ class Booker:
         self.location: Location = location
         self.session: Session = session
         self.config_path: str = config_path
-        self.options: Options = options if options is not None else self.set_options()
+        self._options: Optional[Options] = options
 
         self.ss_unknown_booking_error: bool = True
-        self.ss_filepath: str = os.path.join(
-            os.getcwd(),
-            f'{datetime.datetime.now().strftime("%m%d_%H%M%S")}_browser.png'
-        )
+        self.ss_filepath: Optional[str] = None
 
         self.browser: Union[WebDriver, None] = None
+        self._owns_browser: bool = False
 
         self.today: datetime.datetime = datetime.datetime.today()
         self.weekday: int = self.today.weekday()
@@ -67,41 +158,146 @@ class Booker:
 
         """Safely quit browser on object deletion."""
 
-        if self.browser:
+        if self.browser and self._owns_browser:
             try:
                 self.browser.quit()
             except ImportError:
                 pass
 
+    @property
+    def options(self) -> 'Options':
+
+        """Webdriver options, the defaults are only built when first needed."""
+
+        if self._options is None:
+            self._options = self.set_options()
+
+        return self._options
+
+    @options.setter
+    def options(self, options: 'Options') -> None:
+
+        """Override the webdriver options used by set_browser."""
+
+        self._options = options
+
     @staticmethod
-    def set_options() -> Options:
+    def set_options() -> 'Options':
 
         """Provide a set of default options."""
 
+        from selenium.webdriver.chrome.options import Options
+
         chrome_option = Options()
-        chrome_option.headless = True
-        chrome_option.add_argument("--window-size=1920,1080")
+        chrome_option.add_argument("--headless=new")
+        chrome_option.add_argument("--window-size=1280,720")
+        chrome_option.add_argument("--disable-gpu")
+        chrome_option.add_argument("--disable-dev-shm-usage")
+        chrome_option.add_argument("--disable-background-networking")
+        chrome_option.add_argument("--disable-default-apps")
+        chrome_option.add_argument("--disable-extensions")
+        chrome_option.add_argument("--disable-sync")
+        chrome_option.add_argument("--no-first-run")
+
+        # talk to chromedriver over a pipe rather than a local TCP port
+        chrome_option.add_argument("--remote-debugging-pipe")
+
+        # return on DOMContentLoaded and skip images / notifications
+        chrome_option.page_load_strategy = 'eager'
+        chrome_option.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2
+        })
 
         return chrome_option
 
-    def set_browser(self) -> None:
+    @staticmethod
+    def create_browser(options: Optional['Options'] = None) -> 'WebDriver':
 
-        """Instantiate a browser instance with the given options."""
+        """Instantiate a browser which may be shared between bookings.
 
-        self.browser = webdriver.Chrome(ChromeDriverManager().install(), options=self.options)
+        Parameters
+        ----------
+        options: Optional[Options]
+            Options to use in the webdriver.
+
+        Returns
+        -------
+        browser : WebDriver
+            Browser instance, the caller is responsible for quitting it.
+        """
+
+        from selenium import webdriver
+        from selenium.common.exceptions import WebDriverException
+        from selenium.webdriver.chrome.service import Service
+
+        if options is None:
+            options = Booker.set_options()
+
+        # selenium manager resolves chromedriver, webdriver_manager is a fallback
+        try:
+            return webdriver.Chrome(options=options)
+        except WebDriverException:
+            return webdriver.Chrome(service=Service(_driver_path()), options=options)
+
+    def set_browser(self, browser: Optional['WebDriver'] = None) -> None:
+
+        """Instantiate a browser instance with the given options.
+
+        Parameters
+        ----------
+        browser: Optional[WebDriver]
+            Existing browser to reuse. This is not quit by the Booker.
+        """
+
+        if browser is not None:
+            self.browser = browser
+            self._owns_browser = False
+        else:
+            self.browser = self.create_browser(self.options)
+            self._owns_browser = True
+
+    def close(self) -> None:
+
+        """Quit the browser if it was created by this Booker."""
+
+        if self.browser and self._owns_browser:
+            self.browser.quit()
+
+        self.browser = None
+        self._owns_browser = False
 
     def load_config(self) -> dict:
 
-        """Load user config from .yml file."""
+        """Load user config from .yml file.
+
+        The parsed config is cached until the file changes on disk and
+        must be treated as read-only.
+        """
 
         if not self.config_path.endswith('.yml'):
             raise ValueError('config_path must be a .yml file.')
 
-        try:
-            with open(self.config_path) as fconfig:
-                config = yaml.load(fconfig, Loader=yaml.FullLoader)
-        except FileNotFoundError as e:
-            raise e
+        with _YAML_CACHE_LOCK:
+            st = os.stat(self.config_path)
+            key = (st.st_mtime_ns, st.st_size)
+            cached = _YAML_CACHE.get(self.config_path)
+            if cached is not None and cached[:2] == key:
+                return cached[2]
+
+            import yaml
+            try:
+                from yaml import CSafeLoader
+            except ImportError:
+                from yaml import SafeLoader as CSafeLoader
+
+            try:
+                with open(self.config_path) as fconfig:
+                    config = yaml.load(fconfig, Loader=CSafeLoader)
+            except FileNotFoundError as e:
+                raise e
+
+            _YAML_CACHE[self.config_path] = (*key, config)
 
         return config
 
@@ -115,6 +311,11 @@ class Booker:
             Saves screenshot of final page if True.
         """
 
+        from selenium.common.exceptions import NoSuchElementException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
         # start browser instance
         if not self.browser:
             self.set_browser()
@@ -123,109 +324,190 @@ class Booker:
         user_config = self.load_config()
 
         # navigate to webpage
-        booking_url: str = 'https://www.library.manchester.ac.uk/locations-and-opening-hours/study-spaces/booking/'
-        self.browser.get(booking_url)
+        self.browser.get(self._BOOKING_URL)
 
         # get appropriate session index
         session_idx = self._get_session_idx()
 
         # navigate to session booking page
-        session_xpath: str = f'//*[@id="content"]/div/section/article/div[{self.location}]/table/tbody/tr[{session_idx}]/td[4]/a'
-        self.browser.find_element_by_xpath(session_xpath).click()
+        session_xpath: str = self._SESSION_XPATH_TMPL.format(loc=int(self.location), sess=session_idx)
+        self._click_xpath(session_xpath)
 
-        confirm_xpath: str = '//*[@id="content"]/div/section/article/a'
-        self.browser.find_element_by_xpath(confirm_xpath).click()
+        # chromedriver does not wait on navigation started by a scripted click,
+        # so wait for the session page before looking up the confirm link
+        WebDriverWait(self.browser, self._NAVIGATION_TIMEOUT).until(EC.url_changes(self._BOOKING_URL))
+        self.browser.find_element(By.CSS_SELECTOR, self._CONFIRM_SELECTOR).click()
 
-        # submit form
         try:
-            self.browser.find_element_by_id('username').send_keys(user_config['username'])
-            self.browser.find_element_by_id('password').send_keys(user_config['password'])
+            username, password = user_config['username'], user_config['password']
         except KeyError as e:
             raise e
 
-        self.browser.find_element_by_name('submit').click()
-        self._check_login()
+        # only a shared browser which logged in during an earlier booking may
+        # legitimately skip the login form
+        logged_in = not self._owns_browser and self.browser in _LOGGED_IN_BROWSERS
+        filled = self.browser.execute_script(self._FILL_LOGIN_JS, username, password)
+
+        if not filled and not logged_in:
+            # login page may still be loading - raises TimeoutException if not
+            WebDriverWait(self.browser, self._NAVIGATION_TIMEOUT).until(
+                EC.presence_of_element_located((By.ID, 'username'))
+            )
+
+            filled = self.browser.execute_script(self._FILL_LOGIN_JS, username, password)
+            if not filled:
+                raise NoSuchElementException('Login form is incomplete.')
+
+        # submit form
+        if filled:
+            self.browser.find_element(By.NAME, 'submit').click()
+            login_err, status = self._probe_status()
+            self._check_login(login_err)
+            _LOGGED_IN_BROWSERS.add(self.browser)
+        else:
+            _, status = self._probe_status()
 
         # check if event already booked
-        self._check_book_state()
+        self._check_book_state(status)
 
         # click on register button
-        register_xpath: str = '//*[@id="register"]/div[5]/input'
-        self.browser.find_element_by_xpath(register_xpath).click()
+        self.browser.find_element(By.XPATH, self._REGISTER_XPATH).click()
 
         # check if booked successfully
-        self._check_success()
+        _, status = self._probe_status()
+        self._check_success(status)
 
         if ss_final:
             self.screenshot()
 
-        self.browser.quit()
-
     def screenshot(self) -> None:
 
-        """Takes a screenshot and saves the file."""
+        """Takes a screenshot and saves the file.
+
+        If ss_filepath is unset a timestamped path in the cwd is used.
+        """
+
+        if self.ss_filepath is None:
+            self.ss_filepath = os.path.join(
+                os.getcwd(),
+                f'{datetime.datetime.now().strftime("%m%d_%H%M%S")}_{self.location.name}_{self.session.name}_browser.png'
+            )
+
+        # decode / write off the critical path so the browser can be released
+        png_b64 = self.browser.get_screenshot_as_base64()
+        threading.Thread(target=self._write_screenshot, args=(self.ss_filepath, png_b64)).start()
+
+    @staticmethod
+    def _write_screenshot(filepath: str, png_b64: str) -> None:
+
+        """Writes a base64 encoded screenshot to file."""
+
+        with open(filepath, 'wb') as fss:
+            fss.write(base64.b64decode(png_b64))
+
+        print(f'Saved screenshot to: {filepath}')
+
+    def _click_xpath(self, xpath: str) -> None:
+
+        """Clicks an element on the current page in a single round-trip.
+
+        Parameters
+        ----------
+        xpath: str
+            XPath of the element to click.
+
+        Raises
+        ------
+        NoSuchElementException
+            Raises if the element is not on the page.
+        """
+
+        from selenium.common.exceptions import NoSuchElementException
 
-        self.browser.get_screenshot_as_file(self.ss_filepath)
-        print(f'Saved screenshot to: {self.ss_filepath}')
+        if not self.browser.execute_script(self._CLICK_XPATH_JS, xpath):
+            raise NoSuchElementException(f'Unable to locate element: {xpath}')
 
-    def _check_login(self) -> None:
+    def _probe_status(self) -> Tuple[Optional[str], Optional[str]]:
+
+        """Reads the status of the current page.
+
+        Returns
+        -------
+        login_err : Optional[str]
+            Text of the login error message, None if not shown.
+        status : Optional[str]
+            Text of the page heading, None if not shown.
+        """
+
+        login_err, status = self.browser.execute_script(self._PROBE_STATUS_JS)
+
+        return login_err, status
+
+    @staticmethod
+    def _check_login(login_err: Optional[str]) -> None:
 
         """Checks if login was successful.
 
+        Parameters
+        ----------
+        login_err: Optional[str]
+            Login error message, as returned by _probe_status.
+
         Raises
         ------
         LoginError
             Raises in the event that the username / password are incorrect.
         """
 
-        try:
-            msg = self.browser.find_element_by_xpath('//div[@id="msg" and @class="errors"]')
-        except NoSuchElementException:
-            print('Logged in successfully.')
-        else:
-            raise LoginError(msg.text)
+        if login_err is not None:
+            raise LoginError(login_err)
+
+        print('Logged in successfully.')
 
-    def _check_book_state(self) -> None:
+    def _check_book_state(self, status: Optional[str]) -> None:
 
         """Checks if session has already been booked.
 
+        Parameters
+        ----------
+        status: Optional[str]
+            Page heading, as returned by _probe_status.
+
         Raises
         ------
         AlreadyBookedError
             Raises if the session has already been booked.
         """
 
-        try:
-            msg = self.browser.find_element_by_xpath('//*[@id="content"]/div/section/article/h3')
-        except NoSuchElementException:
-            pass
-        else:
-            if msg.text == 'You are already signed up for this event.':
-                raise AlreadyBookedError(msg.text)
-            if msg.text == 'Thank you, you have registered for this study space period.':
-                print('Booking Successful')
-            if msg.text == 'Bookings for this study space period are now closed.':
-                raise SessionExpiredError(msg.text)
+        if status == self._MSG_ALREADY_BOOKED:
+            raise AlreadyBookedError(status)
+        if status == self._MSG_BOOKED:
+            print('Booking Successful')
+        if status == self._MSG_CLOSED:
+            raise SessionExpiredError(status)
 
-    def _check_success(self) -> None:
+    def _check_success(self, status: Optional[str]) -> None:
 
         """Checks if booking was successful.
 
+        Parameters
+        ----------
+        status: Optional[str]
+            Page heading, as returned by _probe_status.
+
         Raises
         ------
         UnknownBookingError
             Raises if the page is not as expected.
         """
 
-        try:
-            msg = self.browser.find_element_by_xpath('//*[@id="content"]/div/section/article/h3')
-        except NoSuchElementException:
+        if status is None:
             if self.ss_unknown_booking_error:
                 self.screenshot()
             raise UnknownBookingError('Page was not as expected...')
-        else:
-            if msg.text == 'Thank you, you have registered for this study space period.':
-                print('Booking Successful')
+
+        if status == self._MSG_BOOKED:
+            print('Booking Successful')
 
     def _check_datetime(self) -> None:
 
@@ -237,28 +519,18 @@ class Booker:
             Raises if the chosen session is no longer bookable.
         """
 
-        def morning_session(session: Session) -> bool:
-            return session % 2 == 1
-
-        def afternoon_session(session: Session) -> bool:
-            return session % 2 == 0
+        sess_day = _SESSION_DAY[self.session]
 
         # check if session is not in the past
-        am_session, pm_session = ((self.weekday + 1) * 2 + i for i in [-1, 0])
-
-        if self.session < am_session:
+        if sess_day < self.weekday:
             raise SessionExpiredError('Must book for the current day / future.')
-        elif self.session > pm_session:
+        elif sess_day > self.weekday:
             return
 
         # session must be today - check if valid booking
-        valid = False
-        if morning_session(self.session):
-            valid = self.today < self.am_cutoff
-        elif afternoon_session(self.session):
-            valid = self.today < self.pm_cutoff
+        cutoff = self.am_cutoff if _SESSION_IS_AM[self.session] else self.pm_cutoff
 
-        if not valid:
+        if self.today >= cutoff:
             raise SessionExpiredError('Selected session has already closed.')
 
     def _get_session_idx(self) -> int:
@@ -271,10 +543,7 @@ class Booker:
             Adjusted session index.
         """
 
-        events = set(
-            [len(event.find_elements_by_tag_name('tr'))
-             for event in self.browser.find_elements_by_class_name('event')]
-        )
+        events = set(self.browser.execute_script(self._EVENT_ROWS_JS))
 
         if len(events) > 1:
             msg = 'Number of sessions is not consistent across locations.'